@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Disk Pressure Sampler
+Records Jenkins disk usage into a fixed-size ring buffer and forecasts when
+each area will cross its cleanup threshold
+
+The Jenkins Disk Cleanup workflow installs it to /opt/jenkins-tools and
+schedules it from /etc/cron.d/jenkins-disk-pressure:
+    */30 * * * * root python3 /opt/jenkins-tools/disk-pressure-sampler.py sample -q
+Each sample is a statvfs of / plus a walk of the journal; the large jobs and
+workspace trees are only walked every --tree-interval (default 6h).
+An hourly jenkins_disk_cleanup.sh --forecast from the same cron file asks
+`due` which steps to run. forecast and due only read the store.
+"""
+
+import argparse
+import os
+import stat
+import struct
+import sys
+import time
+
+# Color codes for terminal output
+GREEN = '\033[0;32m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+BOLD = '\033[1m'
+NC = '\033[0m'
+
+DEFAULT_STORE = "/var/tmp/jenkins-disk-pressure.ring"
+DEFAULT_CAPACITY = 2016  # 6 weeks of 30-minute samples
+MAX_CAPACITY = 0xffff    # stored as an unsigned short in the header
+DEFAULT_TREE_INTERVAL = "6h"
+
+# (area, path, cleanup step in jenkins_disk_cleanup.sh, default threshold)
+# The root threshold is a percentage of used + available like df -P, matching
+# largest_dirs_and_files.sh (blocks reserved for root are left out)
+AREAS = [
+    ("root", "/", None, "95%"),
+    ("jobs", "/var/lib/jenkins/jobs", "builds", "30G"),
+    ("workspace", "/var/lib/jenkins/workspace", "workspaces", "5G"),
+    ("journal", "/var/log/journal", "journal", "4G"),
+]
+
+# Trees too big to walk on every sample
+TREE_AREAS = {"jobs", "workspace"}
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Header: magic, version, capacity, area count, next slot, stored samples
+HEADER = struct.Struct('<4sHHIII')
+MAGIC = b'JDPS'
+VERSION = 1
+# Record: timestamp, root size as df sees it (used + available), then used bytes per area
+RECORD = struct.Struct('<dQ' + 'Q' * len(AREAS))
+# Stored for an area that was not walked in that sample
+NOT_MEASURED = 0xffffffffffffffff
+
+def print_header(text):
+    print(f"\n{BOLD}{BLUE}{text}{NC}")
+
+def print_fail(message):
+    print(f"{RED}✗ FAIL{NC} - {message}", file=sys.stderr)
+
+def parse_size(value):
+    """Parse sizes like 100M or 4G into bytes"""
+    value = value.strip().upper()
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+def parse_duration(value):
+    """Parse durations like 30m, 12h or 7d into seconds"""
+    value = value.strip().lower()
+    if value and value[-1] in DURATION_UNITS:
+        return float(value[:-1]) * DURATION_UNITS[value[-1]]
+    return float(value)
+
+def human_size(num_bytes):
+    size = float(num_bytes)
+    for unit in ('B', 'K', 'M', 'G', 'T'):
+        if abs(size) < 1024 or unit == 'T':
+            return f"{int(size)}B" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+
+def human_duration(seconds):
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+def directory_usage(path):
+    """Allocated bytes under path on its own filesystem, like du -sx"""
+    try:
+        device = os.lstat(path).st_dev
+    except OSError:
+        return 0
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                total += st.st_blocks * 512
+                if stat.S_ISDIR(st.st_mode) and st.st_dev == device:
+                    stack.append(entry.path)
+    return total
+
+def take_sample(skip=()):
+    """Measure every area not in skip; returns (timestamp, root size, used bytes)"""
+    fs = os.statvfs("/")
+    root_used = (fs.f_blocks - fs.f_bfree) * fs.f_frsize
+    root_size = root_used + fs.f_bavail * fs.f_frsize
+    used = []
+    for name, path, _, _ in AREAS:
+        if name == "root":
+            used.append(root_used)
+        elif name in skip:
+            used.append(NOT_MEASURED)
+        else:
+            used.append(directory_usage(path))
+    return time.time(), root_size, used
+
+class RingStore:
+    """Fixed-size on-disk ring buffer of usage samples"""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, create=True):
+        self.path = path
+        self.capacity = capacity
+        self.next_slot = 0
+        self.count = 0
+        if os.path.exists(path):
+            self._read_header()
+        elif create:
+            self._create()
+        else:
+            raise FileNotFoundError(f"No sample store at {path}; run `sample` first")
+
+    def _create(self):
+        with open(self.path, 'wb') as f:
+            f.write(self._pack_header())
+            f.truncate(HEADER.size + self.capacity * RECORD.size)
+
+    def _pack_header(self):
+        return HEADER.pack(MAGIC, VERSION, self.capacity, len(AREAS),
+                           self.next_slot, self.count)
+
+    def _read_header(self):
+        with open(self.path, 'rb') as f:
+            raw = f.read(HEADER.size)
+        if len(raw) != HEADER.size:
+            raise ValueError(f"{self.path}: truncated header")
+        magic, version, capacity, areas, next_slot, count = HEADER.unpack(raw)
+        if magic != MAGIC or version != VERSION or areas != len(AREAS):
+            raise ValueError(f"{self.path}: not a version {VERSION} sample store")
+        self.capacity, self.next_slot, self.count = capacity, next_slot, count
+
+    def append(self, timestamp, root_size, used):
+        with open(self.path, 'r+b') as f:
+            f.seek(HEADER.size + self.next_slot * RECORD.size)
+            f.write(RECORD.pack(timestamp, root_size, *used))
+            self.next_slot = (self.next_slot + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            f.seek(0)
+            f.write(self._pack_header())
+
+    def samples(self):
+        """Stored samples, oldest first"""
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER.size)
+            data = f.read(self.capacity * RECORD.size)
+        first = (self.next_slot - self.count) % self.capacity
+        result = []
+        for i in range(self.count):
+            slot = (first + i) % self.capacity
+            values = RECORD.unpack_from(data, slot * RECORD.size)
+            result.append((values[0], values[1], list(values[2:])))
+        return result
+
+def fit_growth(points):
+    """Least-squares slope (bytes/second) through (timestamp, bytes) points"""
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if var == 0:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / var
+
+def forecast(samples, thresholds, window):
+    """Per-area growth rate and seconds until its threshold is crossed
+
+    Returns a list of dicts; eta is 0 when already over the threshold and
+    None when the area is not growing towards it.
+    """
+    if not samples:
+        return []
+    latest_time, root_size, _ = samples[-1]
+    recent = [s for s in samples if s[0] >= latest_time - window]
+    results = []
+    for index, (name, path, step, _) in enumerate(AREAS):
+        threshold = thresholds[name]
+        if isinstance(threshold, float):
+            threshold = int(root_size * threshold)
+        points = [(t, used[index]) for t, _, used in recent if used[index] != NOT_MEASURED]
+        if not points:
+            continue
+        current = points[-1][1]
+        rate = fit_growth(points)
+        if current >= threshold:
+            eta = 0.0
+        elif rate > 0:
+            eta = (threshold - current) / rate
+        else:
+            eta = None
+        results.append({
+            'area': name, 'path': path, 'step': step, 'used': current,
+            'threshold': threshold, 'rate': rate, 'eta': eta,
+        })
+    return results
+
+def due_steps(results, horizon):
+    """Cleanup steps worth running now
+
+    A step is due when its own area crosses its threshold within the horizon.
+    When the root filesystem does, every step with something to clean is due,
+    growing or not - a full disk needs space back from wherever it is.
+    """
+    def crosses(r):
+        return r['eta'] is not None and r['eta'] <= horizon
+
+    root_due = any(r['area'] == "root" and crosses(r) for r in results)
+    return [r['step'] for r in results
+            if r['step'] and (crosses(r) or (root_due and r['used'] > 0))]
+
+def parse_thresholds(overrides):
+    thresholds = {}
+    for name, _, _, default in AREAS:
+        thresholds[name] = default
+    for item in overrides or []:
+        name, _, value = item.partition('=')
+        if name not in thresholds:
+            raise ValueError(f"Unknown area '{name}' in threshold {item}")
+        thresholds[name] = value
+    for name, value in thresholds.items():
+        if value.endswith('%'):
+            thresholds[name] = float(value[:-1]) / 100
+        else:
+            thresholds[name] = parse_size(value)
+    return thresholds
+
+def trees_to_skip(samples, interval, now):
+    """Tree areas walked within the last interval"""
+    skip = set()
+    for index, (name, _, _, _) in enumerate(AREAS):
+        if name not in TREE_AREAS:
+            continue
+        walked = [t for t, _, used in samples if used[index] != NOT_MEASURED]
+        if walked and now - walked[-1] < interval:
+            skip.add(name)
+    return skip
+
+def cmd_sample(args):
+    store = RingStore(args.store, args.capacity)
+    skip = trees_to_skip(store.samples(), parse_duration(args.tree_interval), time.time())
+    timestamp, root_size, used = take_sample(skip)
+    store.append(timestamp, root_size, used)
+    if not args.quiet:
+        summary = ", ".join(f"{name}={'-' if u == NOT_MEASURED else human_size(u)}"
+                            for (name, _, _, _), u in zip(AREAS, used))
+        print(f"{GREEN}Sample {store.count}/{store.capacity} recorded{NC} - {summary}")
+    return 0
+
+def cmd_forecast(args):
+    store = RingStore(args.store, create=False)
+    samples = store.samples()
+    results = forecast(samples, parse_thresholds(args.threshold), parse_duration(args.window))
+    if not results:
+        print_fail(f"No samples in {args.store}")
+        return 2
+
+    print_header(f"Disk pressure forecast ({len(samples)} samples, window {args.window})")
+    print(f"{'AREA':<10} {'USED':>8} {'THRESHOLD':>10} {'GROWTH/DAY':>11}  CROSSES IN")
+    for r in results:
+        if r['eta'] is None:
+            eta = "never"
+        elif r['eta'] == 0:
+            eta = f"{RED}now{NC}"
+        else:
+            eta = human_duration(r['eta'])
+        print(f"{r['area']:<10} {human_size(r['used']):>8} {human_size(r['threshold']):>10} "
+              f"{human_size(r['rate'] * 86400):>11}  {eta}")
+
+    steps = due_steps(results, parse_duration(args.horizon))
+    print(f"\nCleanup steps due within {args.horizon}: {', '.join(steps) or 'none'}")
+    return 0
+
+def cmd_due(args):
+    """Print due step names on one line; exit 1 when nothing is due"""
+    store = RingStore(args.store, create=False)
+    samples = store.samples()
+    if len(samples) < 2:
+        print_fail(f"Not enough samples in {args.store} to forecast")
+        return 2
+    results = forecast(samples, parse_thresholds(args.threshold), parse_duration(args.window))
+    steps = due_steps(results, parse_duration(args.horizon))
+    print(" ".join(steps))
+    return 0 if steps else 1
+
+def capacity_type(value):
+    capacity = int(value)
+    if not 1 <= capacity <= MAX_CAPACITY:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_CAPACITY}")
+    return capacity
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--store', default=DEFAULT_STORE, help=f'Ring buffer file (default: {DEFAULT_STORE})')
+    parser.add_argument('--capacity', type=capacity_type, default=DEFAULT_CAPACITY,
+                        help=f'Samples kept when creating a new store (1-{MAX_CAPACITY})')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    sample = subparsers.add_parser('sample', help='Record one usage sample')
+    sample.add_argument('-q', '--quiet', action='store_true')
+    sample.add_argument('--tree-interval', default=DEFAULT_TREE_INTERVAL,
+                        help=f'Minimum time between walks of the jobs and workspace trees '
+                             f'(default: {DEFAULT_TREE_INTERVAL})')
+    sample.set_defaults(func=cmd_sample)
+
+    for name, func, help_text in (
+        ('forecast', cmd_forecast, 'Show growth rates and threshold forecasts'),
+        ('due', cmd_due, 'Print cleanup steps due within the horizon'),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('--window', default='7d', help='History used to fit growth (default: 7d)')
+        sub.add_argument('--horizon', default='24h', help='How far ahead a step counts as due (default: 24h)')
+        sub.add_argument('--threshold', action='append', metavar='AREA=SIZE',
+                         help='Override a threshold, e.g. jobs=40G or root=90%%')
+        sub.set_defaults(func=func)
+
+    args = parser.parse_args()
+    try:
+        sys.exit(args.func(args))
+    except (OSError, ValueError) as e:
+        print_fail(str(e))
+        sys.exit(2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+One-pass Disk Usage Analyzer
+Walks the filesystem once and prints every report largest_dirs_and_files.sh
+used to build from separate du/find passes
+"""
+
+import argparse
+import copy
+import heapq
+import os
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Color codes for terminal output
+GREEN = '\033[0;32m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+BOLD = '\033[1m'
+NC = '\033[0m'
+
+JENKINS_HOME = "/var/lib/jenkins"
+JENKINS_JOBS = "/var/lib/jenkins/jobs"
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+def print_header(text):
+    print(f"\n{BOLD}{BLUE}{text}{NC}")
+
+def print_warning(message):
+    print(f"{YELLOW}⚠ WARNING{NC} - {message}", file=sys.stderr)
+
+def print_fail(message):
+    print(f"{RED}✗ FAIL{NC} - {message}", file=sys.stderr)
+
+def parse_size(value):
+    """Parse sizes like 100M or 1G (find/du suffixes) into bytes"""
+    value = value.strip().upper()
+    if value and value[-1] in SIZE_UNITS:
+        return int(float(value[:-1]) * SIZE_UNITS[value[-1]])
+    return int(value)
+
+def human_size(num_bytes):
+    """Format bytes the way `du -h` does"""
+    size = float(num_bytes)
+    for unit in ('B', 'K', 'M', 'G', 'T'):
+        if size < 1024 or unit == 'T':
+            if unit == 'B':
+                return f"{int(size)}B"
+            return f"{size:.1f}{unit}" if size < 10 else f"{size:.0f}{unit}"
+        size /= 1024
+
+def is_within(path, root):
+    return path == root or path.startswith(root.rstrip('/') + '/')
+
+def disk_usage(st):
+    """Allocated bytes for an inode, matching du rather than ls"""
+    return st.st_blocks * 512
+
+class TopK:
+    """Bounded min-heap keeping the k largest (value, label) pairs"""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def offer(self, value, label):
+        if self.k <= 0:
+            return
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, (value, label))
+        elif value > self.heap[0][0]:
+            heapq.heappushpop(self.heap, (value, label))
+
+    def merge(self, other):
+        for value, label in other.heap:
+            self.offer(value, label)
+
+    def largest(self):
+        return sorted(self.heap, reverse=True)
+
+class Report:
+    """Top-K report over paths at or below a root
+
+    Every worker gets its own spawn() of each report; the copies are merged
+    once the walk is done. Subclasses pick what they offer to the heap.
+    """
+
+    def __init__(self, title, root, k):
+        self.title = title
+        self.root = os.path.normpath(root)
+        self.prefix = self.root.rstrip('/') + '/'
+        self.k = k
+        self.top = TopK(k)
+
+    def depth(self, path):
+        """Levels below the root, or None when path is outside it"""
+        if path == self.root:
+            return 0
+        if path.startswith(self.prefix):
+            return path.count('/', len(self.prefix)) + 1
+        return None
+
+    def spawn(self):
+        clone = copy.copy(self)
+        clone.top = TopK(self.k)
+        return clone
+
+    def merge(self, other):
+        self.top.merge(other.top)
+
+    def offer_directory(self, size, path, entries):
+        pass
+
+    def offer_file(self, size, path, st):
+        pass
+
+    def lines(self):
+        return [f"{human_size(size)}\t{label}" for size, label in self.top.largest()]
+
+class DirectoryReport(Report):
+    """Largest directories (and optionally files) like du --max-depth"""
+
+    def __init__(self, title, root, k, min_depth=0, max_depth=None, name=None,
+                 include_files=False):
+        super().__init__(title, root, k)
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.name = name
+        self.include_files = include_files
+
+    def _wanted(self, path):
+        depth = self.depth(path)
+        if depth is None or depth < self.min_depth:
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        return self.name is None or os.path.basename(path) == self.name
+
+    def offer_directory(self, size, path, entries):
+        if self._wanted(path):
+            self.top.offer(size, path)
+
+    def offer_file(self, size, path, st):
+        if self.include_files and self._wanted(path):
+            self.top.offer(size, path)
+
+class FileReport(Report):
+    """Largest regular files over a size, optionally not modified for a while"""
+
+    def __init__(self, title, root, k, min_size, min_age_days=None):
+        super().__init__(title, root, k)
+        self.min_size = min_size
+        self.min_age_days = min_age_days
+        self.now = time.time()
+
+    def offer_file(self, size, path, st):
+        if size < self.min_size or not stat.S_ISREG(st.st_mode) or self.depth(path) is None:
+            return
+        if self.min_age_days is None:
+            self.top.offer(size, path)
+        elif (self.now - st.st_mtime) // 86400 > self.min_age_days:
+            # Same rounding as find -mtime +N
+            modified = time.strftime('%Y-%m-%d', time.localtime(st.st_mtime))
+            self.top.offer(size, f"{modified}\t{path}")
+
+class EntryCountReport(Report):
+    """Directories holding the most direct entries"""
+
+    def offer_directory(self, size, path, entries):
+        if self.depth(path) is not None:
+            self.top.offer(entries, path)
+
+    def lines(self):
+        return [f"{count}\t{path}" for count, path in self.top.largest()]
+
+class PathSizeReport(Report):
+    """Totals for a fixed list of directories, like du -sh a b c"""
+
+    def __init__(self, title, paths):
+        super().__init__(title, os.path.commonpath(paths), len(paths))
+        self.paths = [os.path.normpath(p) for p in paths]
+        self.sizes = {}
+
+    def spawn(self):
+        clone = copy.copy(self)
+        clone.sizes = {}
+        return clone
+
+    def merge(self, other):
+        self.sizes.update(other.sizes)
+
+    def offer_directory(self, size, path, entries):
+        if path in self.paths:
+            self.sizes[path] = size
+
+    def lines(self):
+        return [f"{human_size(self.sizes[p])}\t{p}" for p in self.paths if p in self.sizes]
+
+def default_reports(root, top_dirs=20, top_files=50, min_file_size=100 * 1024 ** 2):
+    """Every du/find report the diagnostic script prints, in its order"""
+    return [
+        DirectoryReport(f"Top {top_dirs} largest directories from root", root, top_dirs, max_depth=1),
+        DirectoryReport(f"Top {top_dirs} largest directories in /var", "/var", top_dirs, max_depth=2),
+        DirectoryReport(f"Top {top_dirs} largest directories in {JENKINS_HOME}", JENKINS_HOME,
+                        top_dirs, max_depth=2),
+        FileReport(f"Top {top_files} largest files on the system", root, top_files, min_file_size),
+        DirectoryReport(f"Top 50 largest directories/files in {JENKINS_HOME}", JENKINS_HOME, 50,
+                        include_files=True),
+        DirectoryReport("Top 20 largest Jenkins jobs", JENKINS_JOBS, 20, min_depth=1, max_depth=1,
+                        include_files=True),
+        EntryCountReport(f"Top 20 directories in {JENKINS_HOME} with most files", JENKINS_HOME, 20),
+        PathSizeReport("Sizes of key Jenkins directories",
+                       [os.path.join(JENKINS_HOME, d)
+                        for d in ("workspace", "jobs", "caches", "logs", "plugins")]),
+        FileReport(f"Old large files in {JENKINS_HOME} (not modified in 60+ days)", JENKINS_HOME, 50,
+                   100 * 1024 ** 2, min_age_days=60),
+        FileReport("Large log files in /var/log", "/var/log", 50, 50 * 1024 ** 2),
+        DirectoryReport("Breakdown of Jenkins builds by size", JENKINS_JOBS, 50, name="builds"),
+    ]
+
+class Collector:
+    """Per-worker accumulator, merged once all subtrees are walked
+
+    Hard-linked inodes are tracked in a set shared by every worker, so a
+    link spanning two top-level subtrees is still counted once, like du.
+    Only the reports in scope (default: all) are offered what is walked.
+    """
+
+    def __init__(self, reports, seen_inodes, seen_lock, scope=None):
+        self.reports = [r.spawn() for r in reports]
+        self.active = [clone for clone, report in zip(self.reports, reports)
+                       if scope is None or report in scope]
+        self.seen_inodes = seen_inodes
+        self.seen_lock = seen_lock
+        self.errors = 0
+
+    def add_file(self, path, st):
+        if st.st_nlink > 1:
+            key = (st.st_dev, st.st_ino)
+            with self.seen_lock:
+                if key in self.seen_inodes:
+                    return 0
+                self.seen_inodes.add(key)
+        size = disk_usage(st)
+        for report in self.active:
+            report.offer_file(size, path, st)
+        return size
+
+    def add_directory(self, size, path, entries):
+        for report in self.active:
+            report.offer_directory(size, path, entries)
+
+    def merge(self, other):
+        for mine, theirs in zip(self.reports, other.reports):
+            mine.merge(theirs)
+        self.errors += other.errors
+
+    def walk(self, top, device):
+        """Iterative post-order walk of one subtree; returns its total size"""
+        try:
+            top_stat = os.lstat(top)
+            stack = [[top, os.scandir(top), disk_usage(top_stat), 0]]
+        except OSError:
+            self.errors += 1
+            return 0
+
+        subtree_total = 0
+        while stack:
+            frame = stack[-1]
+            path, entries = frame[0], frame[1]
+            try:
+                entry = next(entries, None)
+            except OSError:
+                self.errors += 1
+                entry = None
+
+            if entry is None:
+                entries.close()
+                stack.pop()
+                self.add_directory(frame[2], path, frame[3])
+                if stack:
+                    stack[-1][2] += frame[2]
+                else:
+                    subtree_total = frame[2]
+                continue
+
+            frame[3] += 1
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                self.errors += 1
+                continue
+
+            if stat.S_ISDIR(st.st_mode):
+                # Stay on one filesystem, like du -x
+                if st.st_dev != device:
+                    continue
+                try:
+                    stack.append([entry.path, os.scandir(entry.path), disk_usage(st), 0])
+                except OSError:
+                    self.errors += 1
+                    frame[2] += disk_usage(st)
+            else:
+                frame[2] += self.add_file(entry.path, st)
+
+        return subtree_total
+
+class DiskUsageAnalyzer:
+    def __init__(self, root, top_dirs=20, top_files=50, min_file_size=100 * 1024 ** 2,
+                 workers=None):
+        self.root = os.path.normpath(root)
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        root_prefix = self.root.rstrip('/') + '/'
+        self.reports = [r for r in default_reports(self.root, top_dirs, top_files, min_file_size)
+                        if r.root == self.root or r.root.startswith(root_prefix)]
+        self.seen_inodes = set()
+        self.seen_lock = threading.Lock()
+        self.result = self._new_collector()
+        self.total = 0
+        self.mounts = {}
+        self.elapsed = 0.0
+
+    def _new_collector(self, scope=None):
+        return Collector(self.reports, self.seen_inodes, self.seen_lock, scope)
+
+    def _walk_subtree(self, top, device, scope=None):
+        collector = self._new_collector(scope)
+        total = collector.walk(top, device)
+        return total, collector
+
+    def _report_devices(self):
+        """st_dev of each report root; None when the root does not exist"""
+        devices = {}
+        for report in self.reports:
+            try:
+                devices[report] = os.stat(report.root).st_dev
+            except OSError:
+                devices[report] = None
+        return devices
+
+    def _separate_filesystems(self, device, devices):
+        """Report roots on another filesystem than the scan root
+
+        Returns (start, device, reports) per extra walk. Like du -x run on
+        each report root, a report only sees its own filesystem, so a
+        JENKINS_HOME on its own volume is walked from JENKINS_HOME.
+        """
+        starts = []
+        for report in sorted(self.reports, key=lambda r: len(r.root)):
+            report_device = devices[report]
+            if report_device in (None, device):
+                continue
+            if not any(d == report_device and is_within(report.root, s) for s, d in starts):
+                starts.append((report.root, report_device))
+        return [(start, start_device,
+                 [r for r in self.reports if devices[r] == start_device and is_within(r.root, start)])
+                for start, start_device in starts]
+
+    def analyze(self):
+        """Walk the root once, one worker per top-level subtree"""
+        started = time.monotonic()
+        root_stat = os.lstat(self.root)
+        device = root_stat.st_dev
+        devices = self._report_devices()
+        root_scope = [r for r in self.reports if devices[r] == device]
+        self.result = self._new_collector(root_scope)
+        total = disk_usage(root_stat)
+        entry_count = 0
+        subtrees = []
+
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                entry_count += 1
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    self.result.errors += 1
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    if st.st_dev == device:
+                        subtrees.append(entry.path)
+                else:
+                    total += self.result.add_file(entry.path, st)
+
+        mounts = self._separate_filesystems(device, devices)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._walk_subtree, path, device, root_scope) for path in subtrees]
+            mount_futures = [(start, pool.submit(self._walk_subtree, start, start_device, scope))
+                             for start, start_device, scope in mounts]
+            for future in futures:
+                subtree_total, collector = future.result()
+                total += subtree_total
+                self.result.merge(collector)
+            for start, future in mount_futures:
+                self.mounts[start], collector = future.result()
+                self.result.merge(collector)
+
+        self.result.add_directory(total, self.root, entry_count)
+        self.total = total
+        self.elapsed = time.monotonic() - started
+        return self.result
+
+    def print_reports(self):
+        for report in self.result.reports:
+            print_header(f"{report.title}:")
+            for line in report.lines():
+                print(line)
+
+        print(f"\n{GREEN}Scanned {self.root} ({human_size(self.total)}) "
+              f"in {self.elapsed:.1f}s with {self.workers} workers{NC}")
+        for start, size in self.mounts.items():
+            print(f"{GREEN}Scanned {start} ({human_size(size)}) separately - own filesystem{NC}")
+        if self.result.errors:
+            print_warning(f"{self.result.errors} path(s) could not be read")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--root', default='/', help='Filesystem root to scan (default: /)')
+    parser.add_argument('--top-dirs', type=int, default=20, help='Directories per report')
+    parser.add_argument('--top-files', type=int, default=50, help='Largest files to list')
+    parser.add_argument('--min-file-size', default='100M',
+                        help='Only list files at least this large (default: 100M)')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel subtree walkers')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print_fail(f"Not a directory: {args.root}")
+        sys.exit(1)
+
+    analyzer = DiskUsageAnalyzer(
+        args.root,
+        top_dirs=args.top_dirs,
+        top_files=args.top_files,
+        min_file_size=parse_size(args.min_file_size),
+        workers=args.workers,
+    )
+    analyzer.analyze()
+    analyzer.print_reports()
+
+if __name__ == '__main__':
+    main()
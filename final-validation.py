@@ -405,7 +405,7 @@ class JenkinsfileValidator:
         return True
 
 def main():
-    jenkinsfile_path = "/Users/orlando/_tmp/alwr/jenkins-pipeline-collection/helm-deploy/Jenkinsfile"
+    jenkinsfile_path = sys.argv[1] if len(sys.argv) > 1 else "/Users/orlando/_tmp/alwr/jenkins-pipeline-collection/helm-deploy/Jenkinsfile"
     
     validator = JenkinsfileValidator(jenkinsfile_path)
     success = validator.validate_all()
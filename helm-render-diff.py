@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Helm Render-and-Diff Stage
+Assembles the effective values and env file, renders the chart once (cached
+by content hash) and diffs it against the last deployed render, so no-op
+redeploys can skip `helm upgrade`
+
+Exit codes for `plan` (same convention as terraform plan -detailed-exitcode):
+    0 - rendered manifests match the last deploy, nothing to do
+    1 - error
+    2 - changes found, run helm upgrade and then `record`
+
+With --kube-context the render is compared against `helm get manifest` (and
+hooks) for the release, so rollbacks, manual upgrades and deploys from other
+agents are seen; volatile values are taken from `helm get values` so an
+unchanged release still matches. Without it the last `record` on this agent
+is the reference, which none of those update.
+
+The pipelines push mutable tags (api:$NAMESPACE), so deploy.date is what
+forces a rollout. Images passed with --image are resolved to repo@sha256:...
+after the push; only when every one of them resolves is deploy.date left out
+of the render. The pinned references go to --images-file so helm upgrade
+deploys exactly what was diffed.
+
+Example (mirrors the Setup Files / Deploy Helm Chart stages):
+    helm-render-diff.py plan --namespace dev1 --chart helm-api-core --env dev1 \\
+        --image image.api=$ECR_API_IMAGE --image image.queue=$ECR_QUE_IMAGE \\
+        --set-string deploy.date=$(date +%s) --set-string gitBranchName=$BRANCH_NAME \\
+        --set-file envFile=helm-api-core/files/vars/.env \\
+        --set-string supervisorConfig=files/vars/supervisor.conf \\
+        --kube-context $EKS_CLUSTER_NAME --images-file images.env
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+# Color codes for terminal output
+GREEN = '\033[0;32m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+BOLD = '\033[1m'
+NC = '\033[0m'
+
+DEFAULT_BASE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'helm-render-diff')
+# Values that change on every run; only safe to ignore when images are pinned
+DEFAULT_VOLATILE = ['deploy.date']
+RENDER_CACHE_LIMIT = 20
+# Seconds before a registry lookup counts as unresolved / a helm call fails
+RESOLVE_TIMEOUT = 60
+HELM_TIMEOUT = 300
+
+NO_CHANGES = 0
+ERROR = 1
+CHANGES = 2
+
+DOCUMENT_SPLIT = re.compile(r'^---\s*$', re.M)
+# <account>.dkr.ecr.<region>.amazonaws.com/<repository>:<tag>
+ECR_IMAGE = re.compile(r'^(\d+)\.dkr\.ecr\.([a-z0-9-]+)\.amazonaws\.com/([^:@]+):([^:@/]+)$')
+
+def print_header(text):
+    print(f"\n{BOLD}{BLUE}{text}{NC}")
+
+def print_pass(message):
+    print(f"{GREEN}✓ PASS{NC} - {message}")
+
+def print_fail(message):
+    print(f"{RED}✗ FAIL{NC} - {message}", file=sys.stderr)
+
+def print_warning(message):
+    print(f"{YELLOW}⚠ WARNING{NC} - {message}")
+
+def print_info(message):
+    print(f"   {message}")
+
+def split_assignment(item):
+    key, sep, value = item.partition('=')
+    if not sep or not key:
+        raise ValueError(f"Expected KEY=VALUE, got '{item}'")
+    return key, value
+
+def run_helm(command):
+    """Run a helm command; a hung cluster or registry becomes an error"""
+    try:
+        return subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              timeout=HELM_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"{' '.join(command[:3])} timed out after {HELM_TIMEOUT}s")
+
+def lookup_value(values, key):
+    """Value at a dotted --set key in a nested values dict, or None"""
+    for part in key.split('.'):
+        if not isinstance(values, dict) or part not in values:
+            return None
+        values = values[part]
+    return None if isinstance(values, (dict, list)) else str(values)
+
+def resolve_digest(image):
+    """repo@sha256:... for an image reference, or None if it cannot be resolved
+
+    ECR images are looked up with `aws ecr describe-images`, anything else with
+    `docker buildx imagetools inspect`.
+    """
+    if '@sha256:' in image:
+        return image
+    ecr = ECR_IMAGE.match(image)
+    if ecr:
+        account, region, repository, tag = ecr.groups()
+        command = ['aws', 'ecr', 'describe-images', '--registry-id', account, '--region', region,
+                   '--repository-name', repository, '--image-ids', f'imageTag={tag}',
+                   '--query', 'imageDetails[0].imageDigest', '--output', 'text']
+    else:
+        command = ['docker', 'buildx', 'imagetools', 'inspect', image, '--format', '{{json .Manifest}}']
+    try:
+        proc = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              timeout=RESOLVE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    output = proc.stdout.decode().strip()
+    if proc.returncode != 0 or not output:
+        return None
+    if not ecr:
+        try:
+            output = json.loads(output).get('digest', '')
+        except ValueError:
+            return None
+    if not re.match(r'^sha256:[0-9a-f]{64}$', output):
+        return None
+    repository = image.rsplit(':', 1)[0] if ':' in image.rsplit('/', 1)[-1] else image
+    return f"{repository}@{output}"
+
+class RenderPlan:
+    """Everything that determines the rendered manifests"""
+
+    def __init__(self, chart, release, namespace, env=None, values=None, set_strings=(),
+                 set_files=(), images=(), volatile=DEFAULT_VOLATILE, helm='helm'):
+        self.chart = os.path.normpath(chart)
+        self.release = release
+        self.namespace = namespace
+        self.env = env
+        self.values = values or [os.path.join(self.chart, 'values.yaml')]
+        self.set_strings = [split_assignment(s) for s in set_strings]
+        self.set_files = [split_assignment(s) for s in set_files]
+        self.images = [split_assignment(s) for s in images]
+        duplicated = {k for k, _ in self.images} & {k for k, _ in self.set_strings}
+        if duplicated:
+            raise ValueError(f"Set with both --image and --set-string: {', '.join(sorted(duplicated))}")
+        self.volatile = set(volatile)
+        self.helm = helm
+        self.pinned = None
+        self.deployed_values = {}
+
+    def pin_images(self):
+        """Replace every --image reference with its digest
+
+        Volatile keys are only dropped from the render when every image is
+        pinned; otherwise a changed deploy.date is the only thing that tells
+        a moved tag apart from a no-op, so it has to count as a change.
+        """
+        self.pinned = []
+        unresolved = []
+        for key, image in self.images:
+            digest = resolve_digest(image)
+            if digest is None:
+                unresolved.append(image)
+            self.pinned.append((key, digest or image))
+        if unresolved or not self.images:
+            self.volatile = set()
+        return unresolved
+
+    def assemble(self):
+        """Copy the per-ENV values file over values.yaml, like Setup Files does"""
+        if not self.env:
+            return
+        source = os.path.join(self.chart, 'values', f'{self.env}.yaml')
+        if not os.path.isfile(source):
+            raise ValueError(f"No values file for ENV '{self.env}': {source}")
+        shutil.copyfile(source, os.path.join(self.chart, 'values.yaml'))
+
+    def use_deployed_values(self, values):
+        """Render volatile keys with the values the cluster release was deployed with"""
+        self.deployed_values = values or {}
+
+    def stable_set_strings(self):
+        if self.pinned is None:
+            raise ValueError("pin_images() must run before rendering")
+        stable = []
+        for key, value in self.set_strings:
+            if key in self.volatile:
+                value = lookup_value(self.deployed_values, key)
+                if value is None:
+                    continue
+            stable.append((key, value))
+        return self.pinned + stable
+
+    def helm_args(self):
+        args = [self.helm, 'template', self.release, self.chart, '--namespace', self.namespace]
+        for key, value in self.stable_set_strings():
+            args += ['--set-string', f'{key}={value}']
+        for key, path in self.set_files:
+            args += ['--set-file', f'{key}={path}']
+        for path in self.values:
+            args += ['-f', path]
+        return args
+
+    def helm_version(self):
+        return run_helm([self.helm, 'version', '--short']).stdout.decode().strip()
+
+    def content_hash(self):
+        """Hash of the chart, values, image digests and env file contents"""
+        digest = hashlib.sha256()
+        digest.update(self.helm_version().encode())
+        digest.update('\0'.join(self.helm_args()[1:]).encode())
+        for root, dirs, files in os.walk(self.chart):
+            dirs[:] = sorted(d for d in dirs if d != '.git')
+            for name in sorted(files):
+                self._hash_file(digest, os.path.join(root, name))
+        for path in self.values:
+            self._hash_file(digest, path)
+        for _, path in self.set_files:
+            self._hash_file(digest, path)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _hash_file(digest, path):
+        digest.update(b'\0' + path.encode() + b'\0')
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+
+class RenderStore:
+    """Render cache keyed by content hash, plus the last deployed render"""
+
+    def __init__(self, base_dir):
+        self.renders = os.path.join(base_dir, 'renders')
+        self.deployed = os.path.join(base_dir, 'deployed')
+        os.makedirs(self.renders, exist_ok=True)
+        os.makedirs(self.deployed, exist_ok=True)
+
+    def render_path(self, key):
+        return os.path.join(self.renders, f'{key}.yaml')
+
+    def deployed_path(self, release, namespace):
+        return os.path.join(self.deployed, f'{namespace}.{release}.yaml')
+
+    def render(self, plan, key):
+        """Return (manifest, cached); runs helm template only on a cache miss"""
+        path = self.render_path(key)
+        if os.path.exists(path):
+            os.utime(path)
+            with open(path) as f:
+                return f.read(), True
+
+        proc = run_helm(plan.helm_args())
+        if proc.returncode != 0:
+            raise RuntimeError(f"helm template failed:\n{proc.stderr.decode().strip()}")
+        manifest = proc.stdout.decode()
+        self._write(path, manifest)
+        self._prune()
+        return manifest, False
+
+    def last_deployed(self, release, namespace):
+        try:
+            with open(self.deployed_path(release, namespace)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def record(self, release, namespace, key):
+        path = self.render_path(key)
+        if not os.path.exists(path):
+            raise ValueError(f"No cached render {key}; run plan first")
+        shutil.copyfile(path, self.deployed_path(release, namespace))
+
+    @staticmethod
+    def _write(path, text):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def _prune(self):
+        renders = sorted((os.path.join(self.renders, n) for n in os.listdir(self.renders)
+                          if n.endswith('.yaml')), key=os.path.getmtime, reverse=True)
+        for path in renders[RENDER_CACHE_LIMIT:]:
+            os.remove(path)
+
+class ClusterRelease:
+    """The release as helm stores it in the cluster"""
+
+    def __init__(self, helm, release, namespace, kube_context):
+        self.helm = helm
+        self.release = release
+        self.namespace = namespace
+        self.kube_context = kube_context
+
+    def _get(self, what, *extra):
+        """Output of `helm get <what>`, or None when the release does not exist"""
+        proc = run_helm([self.helm, 'get', what, self.release, '--namespace', self.namespace,
+                         '--kube-context', self.kube_context, *extra])
+        if proc.returncode != 0:
+            error = proc.stderr.decode().strip()
+            if 'not found' in error:
+                return None
+            raise RuntimeError(f"helm get {what} failed:\n{error}")
+        return proc.stdout.decode()
+
+    def values(self):
+        output = self._get('values', '--output', 'json')
+        return json.loads(output) if output else None
+
+    def manifest(self):
+        """Deployed manifests plus hooks, which helm template also prints"""
+        manifest = self._get('manifest')
+        if manifest is None:
+            return None
+        return manifest + (self._get('hooks') or '')
+
+def resource_key(document):
+    """kind/namespace/name of a rendered manifest document"""
+    kind = re.search(r'^kind:\s*(\S+)', document, re.M)
+    metadata = re.search(r'^metadata:\s*\n((?:[ \t]+.*\n?|\s*\n)*)', document, re.M)
+    name = namespace = ""
+    if metadata:
+        block = metadata.group(1)
+        indent = min((len(l) - len(l.lstrip()) for l in block.splitlines() if l.strip()), default=0)
+        for line in block.splitlines():
+            if len(line) - len(line.lstrip()) != indent:
+                continue
+            field, _, value = line.strip().partition(':')
+            if field == 'name' and not name:
+                name = value.strip().strip('"\'')
+            elif field == 'namespace' and not namespace:
+                namespace = value.strip().strip('"\'')
+    return f"{kind.group(1) if kind else '?'}/{namespace or '-'}/{name or '?'}"
+
+def split_resources(manifest):
+    resources = {}
+    for document in DOCUMENT_SPLIT.split(manifest):
+        body = '\n'.join(l for l in document.strip().splitlines() if not l.startswith('#'))
+        if not body.strip():
+            continue
+        resources[resource_key(document)] = document.strip() + '\n'
+    return resources
+
+def diff_resources(old_manifest, new_manifest):
+    """Return (added, removed, changed) resource keys"""
+    old = split_resources(old_manifest or '')
+    new = split_resources(new_manifest)
+    added = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    changed = sorted(k for k in set(old) & set(new) if old[k] != new[k])
+    return added, removed, changed, old, new
+
+def build_plan(args):
+    plan = RenderPlan(
+        args.chart, args.release, args.namespace, env=args.env, values=args.values,
+        set_strings=args.set_string or [], set_files=args.set_file or [],
+        images=args.image or [], volatile=DEFAULT_VOLATILE + (args.volatile or []),
+        helm=args.helm,
+    )
+    for image in plan.pin_images():
+        print_warning(f"No digest for {image} - {', '.join(DEFAULT_VOLATILE)} counts as a change")
+    return plan
+
+def cmd_plan(args):
+    plan = build_plan(args)
+    store = RenderStore(args.state_dir)
+    cluster = None
+    if args.kube_context:
+        cluster = ClusterRelease(plan.helm, plan.release, plan.namespace, args.kube_context)
+        plan.use_deployed_values(cluster.values())
+    plan.assemble()
+    key = plan.content_hash()
+    manifest, cached = store.render(plan, key)
+
+    print_header(f"Helm render for {plan.release} in {plan.namespace}")
+    print_info(f"Render {key[:12]} ({'cached' if cached else 'rendered with ' + plan.helm})")
+    for image_key, image in plan.pinned:
+        print_info(f"{image_key}={image}")
+    if args.key_file:
+        with open(args.key_file, 'w') as f:
+            f.write(key + '\n')
+    if args.images_file:
+        with open(args.images_file, 'w') as f:
+            f.writelines(f"{image_key}={image}\n" for image_key, image in plan.pinned)
+
+    if cluster:
+        previous = cluster.manifest()
+        print_info(f"Comparing with release {plan.release} in context {args.kube_context}")
+    else:
+        previous = store.last_deployed(plan.release, plan.namespace)
+        print_warning("No --kube-context - comparing with this agent's last `record`")
+    if previous is None:
+        print_warning("No previous deploy found - treating everything as changed")
+    elif previous == manifest:
+        print_pass("Rendered manifests match the last deploy - skipping helm upgrade")
+        return NO_CHANGES
+
+    added, removed, changed, old, new = diff_resources(previous, manifest)
+    for label, keys, color in (("added", added, GREEN), ("removed", removed, RED),
+                               ("changed", changed, YELLOW)):
+        for resource in keys:
+            print(f"  {color}{label:<8}{NC} {resource}")
+            if args.show_diff and label == "changed":
+                for line in difflib.unified_diff(old[resource].splitlines(), new[resource].splitlines(),
+                                                 'deployed', 'rendered', lineterm='', n=2):
+                    print_info(line)
+    if previous is not None and not (added or removed or changed):
+        # Only ordering or comments moved; nothing the cluster would see
+        print_pass("No resource changes - skipping helm upgrade")
+        return NO_CHANGES
+    print(f"\n{BOLD}{len(added)} added, {len(removed)} removed, {len(changed)} changed{NC}")
+    return CHANGES
+
+def cmd_record(args):
+    """Mark a render as deployed once helm upgrade has succeeded"""
+    store = RenderStore(args.state_dir)
+    key = args.key
+    if not key:
+        plan = build_plan(args)
+        key = plan.content_hash()
+    store.record(args.release, args.namespace, key)
+    print_pass(f"Recorded render {key[:12]} as deployed for {args.release} in {args.namespace}")
+    return NO_CHANGES
+
+def add_render_arguments(parser, required=True):
+    parser.add_argument('--chart', required=required, help='Chart directory (e.g. helm-api-core)')
+    parser.add_argument('--env', help='Copy values/<ENV>.yaml over values.yaml first')
+    parser.add_argument('-f', '--values', action='append', help='Values file (default: <chart>/values.yaml)')
+    parser.add_argument('--set-string', action='append', metavar='KEY=VALUE')
+    parser.add_argument('--set-file', action='append', metavar='KEY=PATH')
+    parser.add_argument('--image', action='append', metavar='KEY=IMAGE',
+                        help='Image value to pin to its digest (e.g. image.api=$ECR_API_IMAGE)')
+    parser.add_argument('--volatile', action='append', metavar='KEY',
+                        help='Extra --set-string keys to leave out of the render once every '
+                             '--image is pinned (deploy.date always is)')
+    parser.add_argument('--helm', default='helm', help='helm binary (default: helm)')
+
+def add_target_arguments(parser):
+    parser.add_argument('--namespace', required=True)
+    parser.add_argument('--release', default='api-core')
+    parser.add_argument('--state-dir', default=DEFAULT_BASE_DIR,
+                        help=f'Render cache and deploy records (default: {DEFAULT_BASE_DIR})')
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Usage errors exit with ERROR; argparse's own 2 would read as CHANGES"""
+
+    def error(self, message):
+        self.print_usage(sys.stderr)
+        self.exit(ERROR, f"{self.prog}: error: {message}\n")
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().split('\n')[0])
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    plan = subparsers.add_parser('plan', help='Render, cache and diff against the last deploy')
+    add_target_arguments(plan)
+    add_render_arguments(plan)
+    plan.add_argument('--show-diff', action='store_true', help='Print a diff for changed resources')
+    plan.add_argument('--key-file', help='Write the render key here for a later `record --key`')
+    plan.add_argument('--images-file', help='Write the pinned KEY=IMAGE values here for helm upgrade')
+    plan.add_argument('--kube-context', help='Diff against the release in this cluster '
+                                             '(default: the local deploy record)')
+    plan.set_defaults(func=cmd_plan)
+
+    record = subparsers.add_parser('record', help='Mark a render as deployed')
+    add_target_arguments(record)
+    record.add_argument('--key', help='Render key printed by plan (otherwise recomputed)')
+    add_render_arguments(record, required=False)
+    record.set_defaults(func=cmd_record)
+
+    args = parser.parse_args()
+    if args.command == 'record' and not args.key and not args.chart:
+        parser.error("record needs --key or the same --chart/--set-* arguments as plan")
+    try:
+        sys.exit(args.func(args))
+    except (OSError, ValueError, RuntimeError) as e:
+        print_fail(str(e))
+        sys.exit(ERROR)
+
+if __name__ == '__main__':
+    main()
@@ -54,8 +54,8 @@ get_dir_size() {
 ################################################################################
 
 # Check if running in dry-run mode
-# Accept DRY_RUN_CLEANUP from environment or as first argument
-if [[ "${1:-}" == "--dry-run" ]] || [[ "${1:-}" == "-n" ]]; then
+# Accept DRY_RUN_CLEANUP from environment or as an argument
+if [[ " $* " == *" --dry-run "* ]] || [[ " $* " == *" -n "* ]]; then
     DRY_RUN="true"
 elif [[ "${DRY_RUN_CLEANUP:-}" == "true" ]]; then
     DRY_RUN="true"
@@ -73,6 +73,34 @@ else
     echo ""
 fi
 
+# Forecast mode: only run the steps the disk-pressure sampler says are due
+# Accept CLEANUP_FORECAST=true from environment or --forecast as an argument
+ENABLED_STEPS="journal builds workspaces"
+if [[ "${CLEANUP_FORECAST:-}" == "true" ]] || [[ " $* " == *" --forecast "* ]]; then
+    # Installed with its cron entry by the Jenkins Disk Cleanup workflow
+    SAMPLER="${DISK_PRESSURE_SAMPLER:-/opt/jenkins-tools/disk-pressure-sampler.py}"
+    if [[ ! -f "$SAMPLER" ]]; then
+        SAMPLER="$(cd "$(dirname "$0")" && pwd)/disk-pressure-sampler.py"
+    fi
+    FORECAST_RC=0
+    DUE_STEPS=$(python3 "$SAMPLER" due --horizon "${CLEANUP_HORIZON:-24h}") || FORECAST_RC=$?
+    if [[ $FORECAST_RC -eq 0 ]]; then
+        ENABLED_STEPS="$DUE_STEPS"
+        log_info "Forecast mode: steps due within ${CLEANUP_HORIZON:-24h}: $ENABLED_STEPS"
+    elif [[ $FORECAST_RC -eq 1 ]]; then
+        # Scheduled hourly from /etc/cron.d/jenkins-disk-pressure; nothing to do
+        log_info "Forecast mode: no cleanup steps due within ${CLEANUP_HORIZON:-24h}"
+        exit 0
+    else
+        log_warning "Forecast unavailable - running all cleanup steps"
+    fi
+    echo ""
+fi
+
+step_enabled() {
+    [[ " $ENABLED_STEPS " == *" $1 "* ]]
+}
+
 log_info "Starting Jenkins disk cleanup process..."
 log_info "Current disk usage: $(get_disk_usage)"
 echo ""
@@ -97,17 +125,21 @@ fi
 # Step 1: Clean system journal logs
 ################################################################################
 
-log_info "Step 1/5: Cleaning system journal logs..."
-JOURNAL_SIZE_BEFORE=$(get_dir_size /var/log/journal)
-log_info "Journal size before: $JOURNAL_SIZE_BEFORE"
+if step_enabled journal; then
+    log_info "Step 1/5: Cleaning system journal logs..."
+    JOURNAL_SIZE_BEFORE=$(get_dir_size /var/log/journal)
+    log_info "Journal size before: $JOURNAL_SIZE_BEFORE"
 
-if [[ "$DRY_RUN" == "true" ]]; then
-    log_plan "Would run: journalctl --vacuum-time=7d"
-    log_plan "Expected savings: ~4GB (keeps last 7 days only)"
+    if [[ "$DRY_RUN" == "true" ]]; then
+        log_plan "Would run: journalctl --vacuum-time=7d"
+        log_plan "Expected savings: ~4GB (keeps last 7 days only)"
+    else
+        journalctl --vacuum-time=7d
+        JOURNAL_SIZE_AFTER=$(get_dir_size /var/log/journal)
+        log_success "Journal logs cleaned. Size after: $JOURNAL_SIZE_AFTER"
+    fi
 else
-    journalctl --vacuum-time=7d
-    JOURNAL_SIZE_AFTER=$(get_dir_size /var/log/journal)
-    log_success "Journal logs cleaned. Size after: $JOURNAL_SIZE_AFTER"
+    log_info "Step 1/5: skipped (not forecast to be needed)"
 fi
 echo ""
 
@@ -115,86 +147,90 @@ echo ""
 # Step 2: Remove old Jenkins build histories (older than 60 days)
 ################################################################################
 
-log_info "Step 2/5: Removing Jenkins builds older than 60 days..."
-JENKINS_JOBS_DIR="/var/lib/jenkins/jobs"
+if step_enabled builds; then
+    log_info "Step 2/5: Removing Jenkins builds older than 60 days..."
+    JENKINS_JOBS_DIR="/var/lib/jenkins/jobs"
 
-if [[ ! -d "$JENKINS_JOBS_DIR" ]]; then
-    log_warning "Jenkins jobs directory not found: $JENKINS_JOBS_DIR"
-else
-    BUILDS_SIZE_BEFORE=$(get_dir_size $JENKINS_JOBS_DIR)
-    log_info "Jenkins jobs size before: $BUILDS_SIZE_BEFORE"
+    if [[ ! -d "$JENKINS_JOBS_DIR" ]]; then
+        log_warning "Jenkins jobs directory not found: $JENKINS_JOBS_DIR"
+    else
+        BUILDS_SIZE_BEFORE=$(get_dir_size $JENKINS_JOBS_DIR)
+        log_info "Jenkins jobs size before: $BUILDS_SIZE_BEFORE"
     
-    DELETED_COUNT=0
+        DELETED_COUNT=0
     
-    if [[ "$DRY_RUN" == "true" ]]; then
-        # Show sample of first 10 builds that would be deleted
-        echo "  Analyzing builds older than 60 days..."
-        find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | head -10 | while read -r build_dir; do
-            JOB_NAME=$(echo "$build_dir" | sed 's|/var/lib/jenkins/jobs/||' | sed 's|/builds/.*||')
-            BUILD_NUM=$(basename "$build_dir")
-            echo "    - Would delete: $JOB_NAME/builds/$BUILD_NUM"
-        done
-        
-        # Count what would be deleted with progress indicator
-        (
-            SECONDS=0
-            while kill -0 $$ 2>/dev/null; do
-                echo "Analysing ${SECONDS}(s)..."
-                sleep 10
+        if [[ "$DRY_RUN" == "true" ]]; then
+            # Show sample of first 10 builds that would be deleted
+            echo "  Analyzing builds older than 60 days..."
+            find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | head -10 | while read -r build_dir; do
+                JOB_NAME=$(echo "$build_dir" | sed 's|/var/lib/jenkins/jobs/||' | sed 's|/builds/.*||')
+                BUILD_NUM=$(basename "$build_dir")
+                echo "    - Would delete: $JOB_NAME/builds/$BUILD_NUM"
             done
-        ) &
-        PROGRESS_PID=$!
         
-        DELETED_COUNT=$(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | wc -l | tr -d ' ')
+            # Count what would be deleted with progress indicator
+            (
+                SECONDS=0
+                while kill -0 $$ 2>/dev/null; do
+                    echo "Analysing ${SECONDS}(s)..."
+                    sleep 10
+                done
+            ) &
+            PROGRESS_PID=$!
         
-        kill $PROGRESS_PID 2>/dev/null || true
-        wait $PROGRESS_PID 2>/dev/null || true
+            DELETED_COUNT=$(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | wc -l | tr -d ' ')
         
-        log_plan "Found $DELETED_COUNT build directories older than 60 days"
-        log_plan "Estimated savings: 20-30GB"
+            kill $PROGRESS_PID 2>/dev/null || true
+            wait $PROGRESS_PID 2>/dev/null || true
         
-        # Show what's being kept
-        RECENT_BUILDS_COUNT=$(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime -60 2>/dev/null | wc -l | tr -d ' ')
-        log_success "Will preserve $RECENT_BUILDS_COUNT recent builds (< 60 days old)"
-    else
-        # Show sample of builds being deleted
-        echo "  Analyzing builds older than 60 days..."
-        find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | head -10 | while read -r build_dir; do
-            JOB_NAME=$(echo "$build_dir" | sed 's|/var/lib/jenkins/jobs/||' | sed 's|/builds/.*||')
-            BUILD_NUM=$(basename "$build_dir")
-            echo "    - Will delete: $JOB_NAME/builds/$BUILD_NUM"
-        done
+            log_plan "Found $DELETED_COUNT build directories older than 60 days"
+            log_plan "Estimated savings: 20-30GB"
         
-        # Count with progress indicator
-        (
-            SECONDS=0
-            while kill -0 $$ 2>/dev/null; do
-                echo "Counting ${SECONDS}(s)..."
-                sleep 10
+            # Show what's being kept
+            RECENT_BUILDS_COUNT=$(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime -60 2>/dev/null | wc -l | tr -d ' ')
+            log_success "Will preserve $RECENT_BUILDS_COUNT recent builds (< 60 days old)"
+        else
+            # Show sample of builds being deleted
+            echo "  Analyzing builds older than 60 days..."
+            find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | head -10 | while read -r build_dir; do
+                JOB_NAME=$(echo "$build_dir" | sed 's|/var/lib/jenkins/jobs/||' | sed 's|/builds/.*||')
+                BUILD_NUM=$(basename "$build_dir")
+                echo "    - Will delete: $JOB_NAME/builds/$BUILD_NUM"
             done
-        ) &
-        PROGRESS_PID=$!
         
-        TOTAL_TO_DELETE=$(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | wc -l | tr -d ' ')
+            # Count with progress indicator
+            (
+                SECONDS=0
+                while kill -0 $$ 2>/dev/null; do
+                    echo "Counting ${SECONDS}(s)..."
+                    sleep 10
+                done
+            ) &
+            PROGRESS_PID=$!
         
-        kill $PROGRESS_PID 2>/dev/null || true
-        wait $PROGRESS_PID 2>/dev/null || true
+            TOTAL_TO_DELETE=$(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 2>/dev/null | wc -l | tr -d ' ')
         
-        log_info "Found $TOTAL_TO_DELETE build directories to delete"
-        log_info "Starting deletion..."
+            kill $PROGRESS_PID 2>/dev/null || true
+            wait $PROGRESS_PID 2>/dev/null || true
         
-        # Find and delete build directories older than 60 days - only direct subdirectories
-        while IFS= read -r -d '' build_dir; do
-            rm -rf "$build_dir"
-            ((DELETED_COUNT++))
-            if ((DELETED_COUNT % 1000 == 0)); then
-                echo "  Deleted $DELETED_COUNT / $TOTAL_TO_DELETE builds..."
-            fi
-        done < <(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 -print0 2>/dev/null)
+            log_info "Found $TOTAL_TO_DELETE build directories to delete"
+            log_info "Starting deletion..."
         
-        BUILDS_SIZE_AFTER=$(get_dir_size $JENKINS_JOBS_DIR)
-        log_success "Deleted $DELETED_COUNT old builds. Size after: $BUILDS_SIZE_AFTER"
+            # Find and delete build directories older than 60 days - only direct subdirectories
+            while IFS= read -r -d '' build_dir; do
+                rm -rf "$build_dir"
+                ((DELETED_COUNT++))
+                if ((DELETED_COUNT % 1000 == 0)); then
+                    echo "  Deleted $DELETED_COUNT / $TOTAL_TO_DELETE builds..."
+                fi
+            done < <(find "$JENKINS_JOBS_DIR" -type d -path "*/builds/*" ! -path "*/builds/*/*" -mtime +60 -print0 2>/dev/null)
+        
+            BUILDS_SIZE_AFTER=$(get_dir_size $JENKINS_JOBS_DIR)
+            log_success "Deleted $DELETED_COUNT old builds. Size after: $BUILDS_SIZE_AFTER"
+        fi
     fi
+else
+    log_info "Step 2/5: skipped (not forecast to be needed)"
 fi
 echo ""
 
@@ -202,43 +238,47 @@ echo ""
 # Step 3: Clean old PR workspaces (older than 7 days)
 ################################################################################
 
-log_info "Step 3/5: Cleaning old PR workspaces (older than 7 days)..."
-JENKINS_WORKSPACE_DIR="/var/lib/jenkins/workspace"
+if step_enabled workspaces; then
+    log_info "Step 3/5: Cleaning old PR workspaces (older than 7 days)..."
+    JENKINS_WORKSPACE_DIR="/var/lib/jenkins/workspace"
 
-if [[ ! -d "$JENKINS_WORKSPACE_DIR" ]]; then
-    log_warning "Jenkins workspace directory not found: $JENKINS_WORKSPACE_DIR"
-else
-    WORKSPACE_SIZE_BEFORE=$(get_dir_size $JENKINS_WORKSPACE_DIR)
-    log_info "Workspace size before: $WORKSPACE_SIZE_BEFORE"
+    if [[ ! -d "$JENKINS_WORKSPACE_DIR" ]]; then
+        log_warning "Jenkins workspace directory not found: $JENKINS_WORKSPACE_DIR"
+    else
+        WORKSPACE_SIZE_BEFORE=$(get_dir_size $JENKINS_WORKSPACE_DIR)
+        log_info "Workspace size before: $WORKSPACE_SIZE_BEFORE"
     
-    # Find and delete PR workspace directories older than 7 days
-    # Looking for patterns like PR-123, pr-456, etc.
-    DELETED_WS_COUNT=0
+        # Find and delete PR workspace directories older than 7 days
+        # Looking for patterns like PR-123, pr-456, etc.
+        DELETED_WS_COUNT=0
     
-    if [[ "$DRY_RUN" == "true" ]]; then
-        # Count what would be deleted
-        DELETED_WS_COUNT=$(find "$JENKINS_WORKSPACE_DIR" -maxdepth 2 -type d -iname "*pr-*" -mtime +7 2>/dev/null | wc -l | tr -d ' ')
-        log_plan "Would delete $DELETED_WS_COUNT old PR workspaces"
-        log_plan "Estimated savings: 1-5GB"
+        if [[ "$DRY_RUN" == "true" ]]; then
+            # Count what would be deleted
+            DELETED_WS_COUNT=$(find "$JENKINS_WORKSPACE_DIR" -maxdepth 2 -type d -iname "*pr-*" -mtime +7 2>/dev/null | wc -l | tr -d ' ')
+            log_plan "Would delete $DELETED_WS_COUNT old PR workspaces"
+            log_plan "Estimated savings: 1-5GB"
         
-        # Show sample of first 5 PR workspaces that would be deleted
-        if [[ $DELETED_WS_COUNT -gt 0 ]]; then
-            echo "  Sample of PR workspaces that would be deleted:"
-            find "$JENKINS_WORKSPACE_DIR" -maxdepth 2 -type d -iname "*pr-*" -mtime +7 2>/dev/null | head -5 | while read -r pr_dir; do
-                PR_SIZE=$(get_dir_size "$pr_dir")
-                PR_NAME=$(basename "$pr_dir")
-                echo "    - $PR_NAME (Size: $PR_SIZE)"
-            done
-        fi
-    else
-        while IFS= read -r -d '' pr_dir; do
-            rm -rf "$pr_dir"
-            ((DELETED_WS_COUNT++))
-        done < <(find "$JENKINS_WORKSPACE_DIR" -maxdepth 2 -type d -iname "*pr-*" -mtime +7 -print0 2>/dev/null)
+            # Show sample of first 5 PR workspaces that would be deleted
+            if [[ $DELETED_WS_COUNT -gt 0 ]]; then
+                echo "  Sample of PR workspaces that would be deleted:"
+                find "$JENKINS_WORKSPACE_DIR" -maxdepth 2 -type d -iname "*pr-*" -mtime +7 2>/dev/null | head -5 | while read -r pr_dir; do
+                    PR_SIZE=$(get_dir_size "$pr_dir")
+                    PR_NAME=$(basename "$pr_dir")
+                    echo "    - $PR_NAME (Size: $PR_SIZE)"
+                done
+            fi
+        else
+            while IFS= read -r -d '' pr_dir; do
+                rm -rf "$pr_dir"
+                ((DELETED_WS_COUNT++))
+            done < <(find "$JENKINS_WORKSPACE_DIR" -maxdepth 2 -type d -iname "*pr-*" -mtime +7 -print0 2>/dev/null)
         
-        WORKSPACE_SIZE_AFTER=$(get_dir_size $JENKINS_WORKSPACE_DIR)
-        log_success "Deleted $DELETED_WS_COUNT old PR workspaces. Size after: $WORKSPACE_SIZE_AFTER"
+            WORKSPACE_SIZE_AFTER=$(get_dir_size $JENKINS_WORKSPACE_DIR)
+            log_success "Deleted $DELETED_WS_COUNT old PR workspaces. Size after: $WORKSPACE_SIZE_AFTER"
+        fi
     fi
+else
+    log_info "Step 3/5: skipped (not forecast to be needed)"
 fi
 echo ""
 
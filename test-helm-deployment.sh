@@ -128,6 +128,16 @@ else
 fi
 echo ""
 
+# Check every PEM-looking secret in-process before anything reaches helm
+echo "Validating secrets in fetched and merged .env files..."
+if python3 "$WORKSPACE/validate-env-secrets.py" "$TEST_DIR/shared.env" "$TEST_DIR/custom.env" "$TEST_DIR/.env.base"; then
+    echo -e "${GREEN}✓ All secrets are well-formed${NC}"
+else
+    echo -e "${RED}✗ Malformed secrets found - helm upgrade would ship them${NC}"
+    exit 1
+fi
+echo ""
+
 # Test 4: Validate helm chart with test values
 echo -e "${YELLOW}Test 4: Validating helm chart template rendering${NC}"
 cd "$HELM_REPO"
@@ -6,7 +6,7 @@
 set -e
 
 REPO_PATH="/Users/orlando/_tmp/alwr/jenkins-pipeline-collection"
-JENKINSFILE_PATH="${REPO_PATH}/helm-deploy/Jenkinsfile"
+JENKINSFILE_PATH="${1:-${REPO_PATH}/helm-deploy/Jenkinsfile}"
 
 # Color codes
 GREEN='\033[0;32m'
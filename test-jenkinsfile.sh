@@ -6,7 +6,7 @@
 set -e
 
 REPO_PATH="/Users/orlando/_tmp/alwr/jenkins-pipeline-collection"
-JENKINSFILE_PATH="${REPO_PATH}/helm-deploy/Jenkinsfile"
+JENKINSFILE_PATH="${1:-${REPO_PATH}/helm-deploy/Jenkinsfile}"
 
 echo "=================================================="
 echo "Jenkins Pipeline Validation Test Suite"
@@ -29,10 +29,17 @@ else
 fi
 echo ""
 
+# Count all delimiters in a single pass instead of a grep | wc per character
+read -r OPEN_BRACES CLOSE_BRACES OPEN_PARENS CLOSE_PARENS OPEN_BRACKETS CLOSE_BRACKETS < <(
+    awk '{
+        ob += gsub(/[{]/, "&"); cb += gsub(/[}]/, "&")
+        op += gsub(/[(]/, "&"); cp += gsub(/[)]/, "&")
+        os += gsub(/[[]/, "&"); cs += gsub(/[]]/, "&")
+    } END { print ob+0, cb+0, op+0, cp+0, os+0, cs+0 }' "$JENKINSFILE_PATH"
+)
+
 # Test 2: Basic syntax checks - balanced braces
 echo "Test 2: Checking balanced braces..."
-OPEN_BRACES=$(grep -o '{' "$JENKINSFILE_PATH" | wc -l | xargs)
-CLOSE_BRACES=$(grep -o '}' "$JENKINSFILE_PATH" | wc -l | xargs)
 if [ "$OPEN_BRACES" -eq "$CLOSE_BRACES" ]; then
     echo -e "${GREEN}✓ PASS${NC} - Braces are balanced (${OPEN_BRACES} opening, ${CLOSE_BRACES} closing)"
 else
@@ -43,8 +50,6 @@ echo ""
 
 # Test 3: Check balanced parentheses
 echo "Test 3: Checking balanced parentheses..."
-OPEN_PARENS=$(grep -o '(' "$JENKINSFILE_PATH" | wc -l | xargs)
-CLOSE_PARENS=$(grep -o ')' "$JENKINSFILE_PATH" | wc -l | xargs)
 if [ "$OPEN_PARENS" -eq "$CLOSE_PARENS" ]; then
     echo -e "${GREEN}✓ PASS${NC} - Parentheses are balanced (${OPEN_PARENS} opening, ${CLOSE_PARENS} closing)"
 else
@@ -55,8 +60,6 @@ echo ""
 
 # Test 4: Check balanced square brackets
 echo "Test 4: Checking balanced square brackets..."
-OPEN_BRACKETS=$(grep -o '\[' "$JENKINSFILE_PATH" | wc -l | xargs)
-CLOSE_BRACKETS=$(grep -o '\]' "$JENKINSFILE_PATH" | wc -l | xargs)
 if [ "$OPEN_BRACKETS" -eq "$CLOSE_BRACKETS" ]; then
     echo -e "${GREEN}✓ PASS${NC} - Square brackets are balanced (${OPEN_BRACKETS} opening, ${CLOSE_BRACKETS} closing)"
 else
@@ -119,7 +122,7 @@ ERRORS=0
 # Check for unclosed strings (basic check)
 if grep -E "[^\\]\"[^\"]*$" "$JENKINSFILE_PATH" | grep -v "//" | grep -v "^[[:space:]]*\*" > /dev/null 2>&1; then
     echo -e "${YELLOW}⚠ WARNING${NC} - Possible unclosed string detected"
-    ((ERRORS++))
+    ERRORS=$((ERRORS + 1))
 fi
 
 # Check for missing semicolons in obvious places (very basic)
@@ -138,17 +141,17 @@ MISSING_ENVS=0
 
 if ! grep -q "case 'dev1':" "$JENKINSFILE_PATH"; then
     echo -e "${RED}✗ FAIL${NC} - dev1 case statement missing!"
-    ((MISSING_ENVS++))
+    MISSING_ENVS=$((MISSING_ENVS + 1))
 fi
 
 if ! grep -q "case 'mde':" "$JENKINSFILE_PATH"; then
     echo -e "${RED}✗ FAIL${NC} - mde case statement missing!"
-    ((MISSING_ENVS++))
+    MISSING_ENVS=$((MISSING_ENVS + 1))
 fi
 
 if ! grep -q "case 'staging':" "$JENKINSFILE_PATH"; then
     echo -e "${RED}✗ FAIL${NC} - staging case statement missing!"
-    ((MISSING_ENVS++))
+    MISSING_ENVS=$((MISSING_ENVS + 1))
 fi
 
 if [ "$MISSING_ENVS" -eq 0 ]; then
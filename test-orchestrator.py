@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Parallel Test Orchestrator
+Runs every pipeline check as a task graph, concurrently where possible,
+skipping tasks whose inputs have not changed since they last passed
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Color codes for terminal output
+GREEN = '\033[0;32m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+BOLD = '\033[1m'
+NC = '\033[0m'
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(REPO_DIR, ".test-cache.json")
+PIPELINE_PATTERNS = ["Jenkinsfile", "*-Jenkinsfile", "*/Jenkinsfile"]
+HELM_REPO = os.path.join(REPO_DIR, "..", "helm-api-core")
+ENV_FIXTURES = os.path.join("fixtures", "env-secrets")
+# Fixtures validate-env-secrets.py must reject, and the error it must give
+ENV_FIXTURE_ERRORS = {
+    "newline-mangled": "literal \\n sequences left in key",
+    "truncated": "(truncated)",
+}
+
+PASSED = "PASS"
+FAILED = "FAIL"
+CACHED = "CACHED"
+SKIPPED = "SKIPPED"
+BLOCKED = "BLOCKED"
+
+STATUS_COLORS = {
+    PASSED: GREEN, CACHED: GREEN, FAILED: RED, BLOCKED: RED, SKIPPED: YELLOW,
+}
+
+def print_header(text):
+    print(f"\n{BOLD}{BLUE}{text}{NC}")
+
+def print_pass(message):
+    print(f"{GREEN}✓ PASS{NC} - {message}")
+
+def print_fail(message):
+    print(f"{RED}✗ FAIL{NC} - {message}")
+
+def print_info(message):
+    print(f"   {message}")
+
+class Task:
+    """One check in the graph
+
+    inputs are the files whose contents decide whether a cached pass is
+    still valid. Tasks that read remote state (SSM, the cluster) are not
+    cacheable. Tasks sharing a lock never run at the same time. A task with
+    expect_failure passes only when the command exits 1 and its output
+    contains expect_output - for fixtures that must be rejected.
+    """
+
+    def __init__(self, task_id, command, inputs=(), deps=(), requires=(),
+                 require_paths=(), cacheable=True, lock=None, timeout=300,
+                 expect_failure=False, expect_output=None):
+        self.id = task_id
+        self.command = list(command)
+        self.inputs = list(inputs)
+        self.deps = list(deps)
+        self.requires = list(requires)
+        self.require_paths = list(require_paths)
+        self.cacheable = cacheable
+        self.lock = lock
+        self.timeout = timeout
+        self.expect_failure = expect_failure
+        self.expect_output = expect_output
+        self.status = None
+        self.hash = None
+        self.reason = ""
+        self.output = ""
+        self.elapsed = 0.0
+
+    def missing_prerequisite(self):
+        for tool in self.requires:
+            if shutil.which(tool) is None:
+                return f"{tool} not installed"
+        for path in self.require_paths:
+            if not os.path.exists(path):
+                return f"{os.path.relpath(path, REPO_DIR)} not found"
+        return None
+
+    def inputs_hash(self):
+        digest = hashlib.sha256()
+        digest.update("\0".join(self.command).encode())
+        digest.update(f"\0{self.expect_failure}\0{self.expect_output}".encode())
+        for path in sorted(set(self.inputs)):
+            digest.update(b"\0" + path.encode() + b"\0")
+            with open(os.path.join(REPO_DIR, path), 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+def discover_pipelines():
+    found = set()
+    for pattern in PIPELINE_PATTERNS:
+        for path in glob.glob(os.path.join(REPO_DIR, pattern)):
+            if os.path.isfile(path):
+                found.add(os.path.relpath(path, REPO_DIR))
+    return sorted(found)
+
+def build_graph(pipelines, include_docker=False):
+    """Static checks per pipeline, .env fixtures, key and helm checks, optional Docker lint"""
+    tasks = []
+    for pipeline in pipelines:
+        static = [
+            Task(f"syntax:{pipeline}", ["bash", "test-jenkinsfile.sh", pipeline],
+                 inputs=["test-jenkinsfile.sh", pipeline], timeout=60),
+            Task(f"final-validation:{pipeline}", [sys.executable, "final-validation.py", pipeline],
+                 inputs=["final-validation.py", pipeline], timeout=60),
+            Task(f"advanced-validation:{pipeline}", [sys.executable, "validate-advanced.py", pipeline],
+                 inputs=["validate-advanced.py", pipeline], timeout=60),
+        ]
+        tasks.extend(static)
+        if include_docker:
+            tasks.append(Task(
+                f"docker:{pipeline}", ["bash", "test-jenkins-docker.sh", os.path.join(REPO_DIR, pipeline)],
+                inputs=["test-jenkins-docker.sh", pipeline], deps=[t.id for t in static],
+                requires=["docker"], lock="docker", timeout=600,
+            ))
+
+    fixtures = sorted(os.path.relpath(p, REPO_DIR) for p in
+                      glob.glob(os.path.join(REPO_DIR, ENV_FIXTURES, "*.env")))
+    for fixture in fixtures:
+        name = os.path.splitext(os.path.basename(fixture))[0]
+        expected = ENV_FIXTURE_ERRORS.get(name)
+        tasks.append(Task(f"env-secrets:{name}", [sys.executable, "validate-env-secrets.py", fixture],
+                          inputs=["validate-env-secrets.py", fixture], timeout=60,
+                          expect_failure=expected is not None, expect_output=expected))
+
+    tasks.append(Task("validate-key", ["bash", "validate-key.sh"], requires=["openssl"],
+                      cacheable=False, timeout=120))
+    tasks.append(Task("helm-deployment", ["bash", "test-helm-deployment.sh"],
+                      deps=["validate-key"],
+                      requires=["aws", "jq", "helm"], require_paths=[HELM_REPO],
+                      cacheable=False, timeout=600))
+    return tasks
+
+def load_cache():
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache):
+    tmp = CACHE_FILE + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, CACHE_FILE)
+
+class Orchestrator:
+    def __init__(self, tasks, jobs=None, use_cache=True, verbose=False):
+        self.tasks = {t.id: t for t in tasks}
+        self.jobs = jobs or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.verbose = verbose
+        self.cache = load_cache() if use_cache else {}
+        self.locks = {t.lock: threading.Lock() for t in tasks if t.lock}
+        self.print_lock = threading.Lock()
+        for task in tasks:
+            for dep in task.deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"{task.id} depends on unknown task {dep}")
+
+    def _execute(self, task):
+        started = time.monotonic()
+        lock = self.locks.get(task.lock)
+        if lock:
+            lock.acquire()
+        try:
+            proc = subprocess.run(
+                task.command, cwd=REPO_DIR, stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                timeout=task.timeout,
+            )
+            task.output = proc.stdout.decode(errors='replace')
+            task.status, task.reason = self._judge(task, proc.returncode)
+        except subprocess.TimeoutExpired as e:
+            task.output = (e.stdout or b"").decode(errors='replace')
+            task.status = FAILED
+            task.reason = f"timed out after {task.timeout}s"
+        finally:
+            if lock:
+                lock.release()
+        task.elapsed = time.monotonic() - started
+        return task
+
+    @staticmethod
+    def _judge(task, returncode):
+        """Status and reason for a finished command"""
+        if not task.expect_failure:
+            return (PASSED, "") if returncode == 0 else (FAILED, f"exit code {returncode}")
+        if returncode != 1:
+            return FAILED, f"exit code {returncode}, expected 1"
+        if task.expect_output and task.expect_output not in task.output:
+            return FAILED, f"output does not mention '{task.expect_output}'"
+        return PASSED, "rejected as expected"
+
+    def _resolve_without_running(self, task):
+        """Settle tasks that need no process; returns True if settled"""
+        failed_deps = [d for d in task.deps if self.tasks[d].status in (FAILED, BLOCKED)]
+        if failed_deps:
+            task.status, task.reason = BLOCKED, f"{failed_deps[0]} did not pass"
+            return True
+        missing = task.missing_prerequisite()
+        if missing:
+            task.status, task.reason = SKIPPED, missing
+            return True
+        if self.use_cache and task.cacheable:
+            task.hash = task.inputs_hash()
+            if self.cache.get(task.id) == task.hash:
+                task.status, task.reason = CACHED, "inputs unchanged since last pass"
+                return True
+        return False
+
+    def _report(self, task):
+        color = STATUS_COLORS[task.status]
+        with self.print_lock:
+            suffix = f" ({task.reason})" if task.reason else ""
+            print(f"{color}{task.status:<8}{NC} {task.id} [{task.elapsed:.2f}s]{suffix}")
+            if task.output and (task.status == FAILED or self.verbose):
+                for line in task.output.rstrip().splitlines():
+                    print_info(line)
+
+    def run(self):
+        pending = dict(self.tasks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for task_id in list(pending):
+                    task = pending[task_id]
+                    if any(self.tasks[d].status is None for d in task.deps):
+                        continue
+                    del pending[task_id]
+                    if self._resolve_without_running(task):
+                        self._report(task)
+                    else:
+                        running[pool.submit(self._execute, task)] = task
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle among: {', '.join(pending)}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    future.result()
+                    if task.status == PASSED and task.cacheable:
+                        self.cache[task.id] = task.hash or task.inputs_hash()
+                    elif task.status == FAILED:
+                        self.cache.pop(task.id, None)
+                    self._report(task)
+        if self.use_cache:
+            save_cache(self.cache)
+        return list(self.tasks.values())
+
+def print_summary(tasks, elapsed):
+    print_header("Per-task timing")
+    for task in sorted(tasks, key=lambda t: t.elapsed, reverse=True):
+        color = STATUS_COLORS[task.status]
+        print(f"  {task.elapsed:7.2f}s  {color}{task.status:<8}{NC} {task.id}")
+
+    counts = {}
+    for task in tasks:
+        counts[task.status] = counts.get(task.status, 0) + 1
+    summary = ", ".join(f"{counts[s]} {s.lower()}" for s in
+                        (PASSED, CACHED, SKIPPED, FAILED, BLOCKED) if s in counts)
+    print("\n" + "=" * 70)
+    print(f"{BOLD}{len(tasks)} task(s) in {elapsed:.2f}s: {summary}{NC}")
+    print("=" * 70)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('files', nargs='*', help='Pipeline files to check (default: all Jenkinsfiles)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Tasks to run concurrently')
+    parser.add_argument('--docker', action='store_true', help='Also lint in a Jenkins Docker container')
+    parser.add_argument('--no-cache', action='store_true', help='Run every task even if unchanged')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show output of passing tasks')
+    parser.add_argument('--list', action='store_true', help='Print the task graph and exit')
+    args = parser.parse_args()
+
+    pipelines = args.files or discover_pipelines()
+    tasks = build_graph(pipelines, include_docker=args.docker)
+
+    if args.list:
+        for task in tasks:
+            deps = f" <- {', '.join(task.deps)}" if task.deps else ""
+            print(f"{task.id}{deps}")
+        return
+
+    print("=" * 70)
+    print(f"{BOLD}Jenkins Pipeline Validation - Test Orchestrator{NC}")
+    print("=" * 70)
+    print_info(f"Pipelines: {', '.join(pipelines) or 'none'}")
+
+    started = time.monotonic()
+    orchestrator = Orchestrator(tasks, jobs=args.jobs, use_cache=not args.no_cache,
+                                verbose=args.verbose)
+    results = orchestrator.run()
+    print_summary(results, time.monotonic() - started)
+
+    if any(t.status in (FAILED, BLOCKED) for t in results):
+        print_fail("Validation failed")
+        sys.exit(1)
+    print_pass("All runnable checks passed")
+
+if __name__ == '__main__':
+    main()
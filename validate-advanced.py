@@ -140,8 +140,14 @@ class JenkinsfileValidator:
         
         # For each switch, verify it has the expected cases
         expected_cases = ['dev1', 'mde', 'staging']
+        # A switch in the else branch of `if (params.ENV == 'x') { error ... }`
+        # can never see 'x', so it does not need a case for it
+        guard_pattern = re.compile(
+            r"if\s*\(\s*params\.ENV\s*==\s*'(\w+)'\s*\)\s*\{\s*error\b[^{}]*\}\s*else\s*\{\s*$")
         
         for i, switch in enumerate(switches, 1):
+            guard = guard_pattern.search(self.content[max(0, switch.start() - 500):switch.start()])
+            rejected = guard.group(1) if guard else None
             start_pos = switch.end()
             # Find the closing brace of this switch (simplified)
             brace_count = 0
@@ -163,12 +169,14 @@ class JenkinsfileValidator:
             # Check for expected cases
             missing_cases = []
             for case in expected_cases:
-                if f"case '{case}':" not in switch_content:
+                if case != rejected and f"case '{case}':" not in switch_content:
                     missing_cases.append(case)
             
             if missing_cases:
                 print_fail(f"Switch {i}: Missing cases: {missing_cases}")
                 self.errors.append(f"Missing cases in switch {i}")
+            elif rejected:
+                print_pass(f"Switch {i}: All reachable cases present ('{rejected}' rejected by guard)")
             else:
                 print_pass(f"Switch {i}: All expected cases present (dev1, mde, staging)")
         
@@ -338,7 +346,7 @@ class JenkinsfileValidator:
         return True
 
 if __name__ == '__main__':
-    jenkinsfile_path = "/Users/orlando/_tmp/alwr/jenkins-pipeline-collection/helm-deploy/Jenkinsfile"
+    jenkinsfile_path = sys.argv[1] if len(sys.argv) > 1 else "/Users/orlando/_tmp/alwr/jenkins-pipeline-collection/helm-deploy/Jenkinsfile"
     
     validator = JenkinsfileValidator(jenkinsfile_path)
     success = validator.validate_all()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Batch PEM/Secret Validator for rendered .env files
+Finds every PEM-looking value in .env files (fetchSSMParameters output or
+the merged files/vars/.env) and checks structure and escaping in-process,
+without an openssl call per key or a pod round-trip
+
+Usage:
+    validate-env-secrets.py shared.env dev1.env mde.env staging.env
+    validate-env-secrets.py fixtures/          # every *.env / .env* inside
+"""
+
+import argparse
+import binascii
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Color codes for terminal output
+GREEN = '\033[0;32m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+BLUE = '\033[0;34m'
+BOLD = '\033[1m'
+NC = '\033[0m'
+
+ASSIGNMENT = re.compile(r'^(?:export\s+)?([A-Za-z_][A-Za-z0-9_.]*)=(.*)$')
+BASE64_LINE = re.compile(r'^[A-Za-z0-9+/]+=*$')
+PEM_BEGIN = re.compile(r'-----BEGIN ([A-Z0-9 ]+)-----')
+SECRET_NAME = re.compile(r'(PRIVATE_KEY|_PEM|_CERT|CERTIFICATE)$')
+
+RSA_ENCRYPTION_OID = '1.2.840.113549.1.1.1'
+
+ERROR = "error"
+WARNING = "warning"
+
+def print_header(text):
+    print(f"\n{BOLD}{BLUE}{text}{NC}")
+
+def print_pass(message):
+    print(f"{GREEN}✓ PASS{NC} - {message}")
+
+def print_fail(message):
+    print(f"{RED}✗ FAIL{NC} - {message}")
+
+def print_warning(message):
+    print(f"{YELLOW}⚠ WARNING{NC} - {message}")
+
+def print_info(message):
+    print(f"   {message}")
+
+class EnvEntry:
+    """One assignment from a .env file, possibly spanning several lines"""
+
+    def __init__(self, name, lineno, first_value):
+        self.name = name
+        self.lineno = lineno
+        self.raw_lines = [first_value]
+        self.orphan_lines = 0
+        self.issues = []
+
+    @property
+    def raw(self):
+        return '\n'.join(self.raw_lines)
+
+    def is_secret(self):
+        return '-----BEGIN' in self.raw or bool(SECRET_NAME.search(self.name))
+
+    def _pem_open(self):
+        raw = self.raw
+        return '-----BEGIN' in raw and '-----END' not in raw[raw.index('-----BEGIN'):]
+
+    def _quote_open(self):
+        raw = self.raw
+        if not raw or raw[0] not in '"\'':
+            return False
+        body = raw[1:]
+        quote = raw[0]
+        if quote == '"':
+            body = body.replace('\\\\', '').replace('\\"', '')
+        return quote not in body
+
+    def wants_more(self):
+        if self.raw and self.raw[0] in '"\'':
+            return self._quote_open()
+        return self._pem_open()
+
+def parse_env(path):
+    """Stream a .env file into EnvEntry objects
+
+    Multi-line values are followed while a quote or PEM block is still open.
+    Lines without an assignment outside such a block are attached to the
+    previous entry as orphans - the mangling the awk merge produces.
+    """
+    entries = []
+    current = None
+    with open(path, newline='') as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            stripped = line.rstrip('\r')
+            match = ASSIGNMENT.match(stripped)
+
+            if current is not None and current.wants_more():
+                # A base64 line can look like NAME== - only a real assignment
+                # ends an open block early
+                if match and not BASE64_LINE.match(stripped.strip()):
+                    current.issues.append((ERROR, f"value cut off by line {lineno} ({match.group(1)}=...)"))
+                    current = None
+                else:
+                    current.raw_lines.append(line)
+                    continue
+
+            if not stripped.strip() or stripped.lstrip().startswith('#'):
+                current = None
+                continue
+
+            if match:
+                current = EnvEntry(match.group(1), lineno, line[match.start(2):])
+                entries.append(current)
+            elif entries:
+                entries[-1].raw_lines.append(line)
+                entries[-1].orphan_lines += 1
+    return entries
+
+def closed_pem_block(raw):
+    """True for a bare PEM block that ends with its own END line
+
+    fetchSSMParameters writes NAME=VALUE with jq -r and never quotes, so a key
+    from SSM arrives as unquoted lines; the chart's env file parser keeps them.
+    """
+    begin = PEM_BEGIN.match(raw)
+    return bool(begin) and f"-----END {begin.group(1)}-----" in raw[begin.end():]
+
+def decode_value(entry):
+    """Value as the chart's env file parser will see it, plus escaping issues"""
+    raw = entry.raw
+    issues = []
+    if raw.startswith('"') and raw.rstrip('\r').endswith('"') and len(raw.rstrip('\r')) > 1:
+        value = raw.rstrip('\r')[1:-1]
+        value = value.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+    elif raw.startswith("'") and raw.rstrip('\r').endswith("'") and len(raw.rstrip('\r')) > 1:
+        value = raw.rstrip('\r')[1:-1]
+        if '\\n' in value:
+            issues.append((ERROR, "escaped \\n inside single quotes is not expanded"))
+    else:
+        value = raw
+        if raw and raw[0] in '"\'':
+            issues.append((ERROR, "unterminated quote"))
+        if '\n' in raw:
+            if not closed_pem_block(raw):
+                issues.append((ERROR, f"unquoted multi-line value ({len(entry.raw_lines)} lines) "
+                                      "that is not a complete PEM block"))
+        elif '\\n' in raw:
+            issues.append((ERROR, "escaped \\n in unquoted value is not expanded; quote it"))
+    if entry.orphan_lines:
+        issues.append((ERROR, f"{entry.orphan_lines} continuation line(s) without an assignment"))
+    return value, issues
+
+def read_der(data, offset=0):
+    """Parse one DER TLV at offset; returns (tag, content_start, end)"""
+    if offset + 2 > len(data):
+        raise ValueError("truncated DER header")
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7f
+        if count == 0 or count > 4 or offset + count > len(data):
+            raise ValueError("invalid DER length")
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    if offset + length > len(data):
+        raise ValueError(f"DER value overruns data by {offset + length - len(data)} byte(s)")
+    return tag, offset, offset + length
+
+def der_children(data, start, end):
+    children = []
+    while start < end:
+        tag, content, stop = read_der(data, start)
+        children.append((tag, data[content:stop]))
+        if tag & 0x20:
+            der_children(data, content, stop)
+        start = stop
+    return children
+
+def decode_oid(content):
+    first = content[0]
+    parts = [str(min(first // 40, 2)), str(first - 40 * min(first // 40, 2))]
+    value = 0
+    for byte in content[1:]:
+        value = (value << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            parts.append(str(value))
+            value = 0
+    return '.'.join(parts)
+
+def check_rsa_key(der):
+    """Consistency checks `openssl pkey -check` performs on RSAPrivateKey"""
+    tag, start, end = read_der(der)
+    fields = der_children(der, start, end)
+    if tag != 0x30 or len(fields) < 9 or any(t != 0x02 for t, _ in fields[:9]):
+        return [(ERROR, "RSAPrivateKey is not a SEQUENCE of 9 INTEGERs")]
+    _, n, e, d, p, q, dp, dq, qinv = [int.from_bytes(v, 'big') for _, v in fields[:9]]
+    issues = []
+    if n != p * q:
+        issues.append((ERROR, "RSA modulus is not p*q"))
+    if p > 1 and q > 1:
+        if (d * e) % (p - 1) != 1 % (p - 1) or (d * e) % (q - 1) != 1 % (q - 1):
+            issues.append((ERROR, "RSA d is not the inverse of e"))
+        if dp != d % (p - 1) or dq != d % (q - 1):
+            issues.append((ERROR, "RSA CRT exponents do not match d"))
+        if (qinv * q) % p != 1:
+            issues.append((ERROR, "RSA CRT coefficient is wrong"))
+    return issues
+
+def check_der(label, der):
+    try:
+        tag, start, end = read_der(der)
+        if end != len(der):
+            return [(ERROR, f"{len(der) - end} trailing byte(s) after DER structure")]
+        if tag != 0x30:
+            return [(ERROR, "DER does not start with a SEQUENCE")]
+        fields = der_children(der, start, end)
+        if label == "RSA PRIVATE KEY":
+            return check_rsa_key(der)
+        if label == "PRIVATE KEY":
+            # PKCS#8: version, AlgorithmIdentifier, OCTET STRING privateKey
+            if len(fields) < 3 or fields[0][0] != 0x02 or fields[1][0] != 0x30 or fields[2][0] != 0x04:
+                return [(ERROR, "not a PKCS#8 PrivateKeyInfo structure")]
+            alg = fields[1][1]
+            oid_tag, oid_start, oid_end = read_der(alg)
+            if oid_tag == 0x06 and decode_oid(alg[oid_start:oid_end]) == RSA_ENCRYPTION_OID:
+                return check_rsa_key(fields[2][1])
+            # EC keys wrap a SEQUENCE; Ed25519/X25519 a bare OCTET STRING
+            tag, start, end = read_der(fields[2][1])
+            if tag == 0x30:
+                der_children(fields[2][1], start, end)
+    except (ValueError, IndexError) as e:
+        return [(ERROR, f"invalid DER: {e}")]
+    return []
+
+def check_pem(value):
+    """Structural checks on a decoded PEM value"""
+    issues = []
+    if '\r' in value:
+        issues.append((ERROR, "carriage return characters (CRLF mangling)"))
+        value = value.replace('\r', '')
+    if '\\n' in value:
+        issues.append((ERROR, "literal \\n sequences left in key after decoding"))
+
+    blocks = list(PEM_BEGIN.finditer(value))
+    if not blocks:
+        return issues + [(ERROR, "no -----BEGIN ...----- line")]
+    if value[:blocks[0].start()].strip():
+        issues.append((ERROR, "unexpected text before BEGIN line"))
+    if len(blocks) > 1 and any(b.group(1) != "CERTIFICATE" for b in blocks):
+        issues.append((ERROR, f"{len(blocks)} BEGIN lines in one value (merged or duplicated key)"))
+
+    for block in blocks:
+        label = block.group(1)
+        end_marker = f"-----END {label}-----"
+        end = value.find(end_marker, block.end())
+        if end < 0:
+            other_end = re.search(r'-----END ([A-Z0-9 ]+)-----', value[block.end():])
+            if other_end:
+                issues.append((ERROR, f"BEGIN {label} closed by END {other_end.group(1)}"))
+            else:
+                issues.append((ERROR, f"missing {end_marker} (truncated)"))
+            continue
+        if block is blocks[-1] and value[end + len(end_marker):].strip():
+            issues.append((ERROR, "unexpected text after END line"))
+
+        body = value[block.end():end]
+        if body and not body.startswith('\n'):
+            issues.append((ERROR, "no newline after BEGIN line (newlines stripped)"))
+        lines = [l.strip() for l in body.split('\n') if l.strip()]
+        if len(lines) == 1 and len(lines[0]) > 76:
+            issues.append((ERROR, f"body is a single {len(lines[0])}-character line (newlines stripped)"))
+        if any(':' in l for l in lines):
+            # Legacy encrypted keys carry RFC 1421 headers; skip them
+            lines = [l for l in lines if ':' not in l]
+        for i, line in enumerate(lines, 1):
+            if not BASE64_LINE.match(line):
+                issues.append((ERROR, f"body line {i} has non-base64 characters: {line[:20]}..."))
+                break
+            if len(line) > 64 and len(lines) > 1:
+                issues.append((WARNING, f"body line {i} is {len(line)} characters (PEM wraps at 64)"))
+                break
+        joined = ''.join(lines)
+        if '=' in joined.rstrip('='):
+            issues.append((ERROR, "base64 padding in the middle of the body (lines merged out of order)"))
+            continue
+        if len(joined) % 4:
+            issues.append((ERROR, f"base64 length {len(joined)} is not a multiple of 4 (truncated)"))
+            continue
+        try:
+            der = binascii.a2b_base64(joined)
+        except binascii.Error as e:
+            issues.append((ERROR, f"base64 does not decode: {e}"))
+            continue
+        issues.extend(check_der(label, der))
+    return issues
+
+def validate_entry(env_name, entry):
+    value, issues = decode_value(entry)
+    issues = list(entry.issues) + issues
+    if '-----BEGIN' in value:
+        issues.extend(check_pem(value))
+    elif value.strip() and SECRET_NAME.search(entry.name):
+        issues.append((ERROR, "named like a key but has no PEM BEGIN line"))
+    return env_name, entry, issues
+
+def collect_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = set(glob.glob(os.path.join(path, '*.env')) + glob.glob(os.path.join(path, '.env*')))
+            files.extend(sorted(p for p in found if os.path.isfile(p)))
+        else:
+            files.append(path)
+    return files
+
+def env_name_for(path):
+    name = os.path.basename(path)
+    if name.endswith('.env'):
+        return name[:-4] or name
+    return name
+
+def validate_files(paths, jobs=None):
+    """Parse every file and validate every secret concurrently
+
+    Returns a list of (env name, entry, issues) in file order.
+    """
+    files = collect_files(paths)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        parsed = list(pool.map(parse_env, files))
+        work = []
+        for path, entries in zip(files, parsed):
+            env_name = env_name_for(path)
+            names = [e.name for e in entries]
+            for entry in entries:
+                # Orphan lines are usually pieces of a mangled key, whatever they follow
+                if entry.is_secret() or entry.orphan_lines:
+                    if names.count(entry.name) > 1:
+                        entry.issues.append((WARNING, f"defined {names.count(entry.name)} times in {path}"))
+                    work.append((env_name, entry))
+        return list(pool.map(lambda item: validate_entry(*item), work)), files
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('paths', nargs='+', help='.env files or directories of them')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Parallel workers')
+    parser.add_argument('--strict', action='store_true', help='Treat warnings as failures')
+    args = parser.parse_args()
+
+    missing = [p for p in args.paths if not os.path.exists(p)]
+    if missing:
+        print_fail(f"Not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    results, files = validate_files(args.paths, jobs=args.jobs)
+    print_header(f"Validating secrets in {len(files)} env file(s)")
+
+    errors = warnings = 0
+    for env_name, entry, issues in results:
+        location = f"{env_name}:{entry.name} (line {entry.lineno})"
+        entry_errors = [m for s, m in issues if s == ERROR]
+        entry_warnings = [m for s, m in issues if s == WARNING]
+        errors += len(entry_errors)
+        warnings += len(entry_warnings)
+        if entry_errors:
+            print_fail(location)
+        elif entry_warnings:
+            print_warning(location)
+        else:
+            print_pass(location)
+        for message in entry_errors + entry_warnings:
+            print_info(message)
+
+    print("\n" + "=" * 70)
+    print(f"{BOLD}{len(results)} secret(s) checked: {errors} error(s), {warnings} warning(s){NC}")
+    print("=" * 70)
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
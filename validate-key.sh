@@ -88,12 +88,15 @@ if [ -z "$GOOGLE_SHEETS_API_PRIVATE_KEY" ]; then
     exit 1
 fi
 
-
-echo "✓ Key written to /tmp/test_key.pem"
+# Private to this user and removed on exit
+KEY_FILE=$(umask 077 && mktemp "${TMPDIR:-/tmp}/test_key.XXXXXX")
+trap 'rm -f "$KEY_FILE"' EXIT
+echo "$GOOGLE_SHEETS_API_PRIVATE_KEY" > "$KEY_FILE"
+echo "✓ Key written to $KEY_FILE"
 echo ""
 
 echo "=== Step 2: Validate RSA private key format ==="
-openssl pkey -in /tmp/test_key.pem -check -noout
+openssl pkey -in "$KEY_FILE" -check -noout
 KEY_CHECK=$?
 if [ $KEY_CHECK -eq 0 ]; then
     echo "✓ Key format is valid"
@@ -103,7 +106,7 @@ fi
 echo ""
 
 echo "=== Step 3: Parse ASN.1 structure ==="
-openssl asn1parse -in /tmp/test_key.pem
+openssl asn1parse -in "$KEY_FILE"
 ASN_CHECK=$?
 if [ $ASN_CHECK -eq 0 ]; then
     echo "✓ ASN.1 structure is valid"
@@ -113,7 +116,7 @@ fi
 echo ""
 
 echo "=== Step 4: Extract key info ==="
-openssl pkey -in /tmp/test_key.pem -text -noout | head -20
+openssl pkey -in "$KEY_FILE" -text -noout | head -20
 echo ""
 
 echo "=== Summary ==="